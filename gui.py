@@ -5,11 +5,47 @@ from PIL import Image, ImageTk
 import threading
 import queue
 import os
-
-from models import TextToImageModel, ImageClassificationModel
-from oop_concepts import OOPConcepts, log_decorator, time_decorator
-from utils import make_thumbnail, detect_device
-import torch
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import codecs
+import functools
+from collections import OrderedDict
+
+# models/torch are imported lazily (see _get_model / _ensure_device): they pull in
+# transformers, diffusers and the CUDA libraries, which the bare window doesn't need
+from oop_concepts import OOPConcepts, instrument
+from utils import make_thumbnail, detect_device, save_pil_image
+
+# number of decoded thumbnails (PhotoImages) kept for quick re-display
+THUMB_CACHE_SIZE = 32
+
+# text files are read off the Tk thread in chunks and capped in size
+TEXT_CHUNK_SIZE = 64 * 1024
+MAX_TEXT_INPUT = 2 * 1024 * 1024
+
+# rough GPU memory needed per model (bytes); idle models are unloaded to make room
+MODEL_VRAM_ESTIMATES = {
+    "Text-to-Image": 4 * 1024 ** 3,
+    "Image Classification": 512 * 1024 ** 2,
+}
+
+# output log is trimmed from the top beyond this many lines
+MAX_OUTPUT_LINES = 500
+
+# longest string worth stat()-ing as a pasted image path
+MAX_PATH_LEN = 260 if os.name == "nt" else 4096
+
+@functools.lru_cache(maxsize=8)
+def _format_info(name, category, description, loaded):
+    """Text shown in the model info pane (pure function of the model metadata)."""
+    return (
+        f"Model Name: {name}\n"
+        f"Category: {category}\n"
+        f"Description: {description}\n"
+        f"Loaded: {loaded}\n"
+    )
 
 # -------------------------
 # Base window (simple)
@@ -29,27 +65,78 @@ class AIGUI(BaseGUI, OOPConcepts):
     def __init__(self):
         BaseGUI.__init__(self)
         OOPConcepts.__init__(self)
-        self._device = detect_device(torch)
-        self._models = {
-            "Text-to-Image": TextToImageModel(),
-            "Image Classification": ImageClassificationModel()
+        self._device = None  # detected on first model load (see _ensure_device)
+        # model wrappers (class names in models.py) are created on first use (see _get_model)
+        self._model_factories = {
+            "Text-to-Image": "TextToImageModel",
+            "Image Classification": "ImageClassificationModel"
+        }
+        self._models = {}
+        self._models_lock = threading.Lock()
+        self._loaded = set()  # names of loaded models (GUI-side view of load state)
+        # per-model locks: one load/unload of a given model at a time
+        self._load_locks = {name: threading.Lock() for name in self._model_factories}
+        # per-model "busy" locks: held around run() and unload(), so eviction can skip busy models
+        self._busy_locks = {name: threading.Lock() for name in self._model_factories}
+        self._model_lru = OrderedDict()  # model names, least recently used first
+        # dispatch tables: model name -> input gatherer, result type -> handler
+        self._gatherers = {
+            "Text-to-Image": self._gather_text_prompt,
+            "Image Classification": self._gather_image_path
+        }
+        self._result_handlers = {
+            "image": self._handle_image_result,
+            "classifications": self._handle_classification_result
         }
         # which model is selected by dropdown
         self.model_var = tk.StringVar(value="Text-to-Image")
 
-        # Threading & result queue
+        # Worker pools & result queue
+        # a single inference worker serializes access to the (non-reentrant) pipelines
         self._result_queue = queue.Queue()
-        self._worker_thread = None
-
-        # store last displayed image so PhotoImage reference is kept
+        self._infer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="infer")
+        self._load_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="load")
+        # small file reads get their own worker so they never wait behind a model load
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io")
+        self._pending_runs = 0  # only touched from the Tk thread
+
+        # background asyncio loop orchestrating multi-step jobs (e.g. the chain);
+        # blocking model calls are still handed to the pools above
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="asyncio", daemon=True).start()
+
+        # pool workers are non-daemon threads, so queued work must be cancelled on close
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # inference cache: (model_name, input hash) -> result dict (LRU)
+        self._infer_cache = OrderedDict()
+        self._infer_cache_lock = threading.Lock()
+        self._infer_cache_size = 32
+
+        # store last displayed images so PhotoImage references are kept
         self._last_photoimage = None
+        self._input_photoimage = None
+        # PhotoImage owned by generated results (not in _thumb_cache), pasted into in place
+        self._output_photoimage = None
+        # (path, mtime, file size, thumb size) -> PhotoImage (LRU); also keeps them alive
+        self._thumb_cache = OrderedDict()
+
+        # last text rendered into the bottom info panes (skip identical rewrites)
+        self._info_cache = None
+        self._oop_text = None  # explanation() is invariant, computed once
+
+        # stripped input text, re-read only after the widget reports <<Modified>>
+        self._cached_prompt = None
+        self._input_dirty = True
 
         # build UI
         self._build_menu()
         self._build_top()
         self._build_center()
         self._build_bottom()
-        self._poll_results()  # start polling the queue for model results
+        # workers wake the Tk loop with a virtual event once a result is queued
+        self.bind("<<ModelResult>>", self._drain_queue)
+        self._poll_results()  # low-frequency safety net in case an event is dropped
 
     # -------------------------
     # Menu bar
@@ -58,12 +145,13 @@ class AIGUI(BaseGUI, OOPConcepts):
         mb = tk.Menu(self)
         # File
         filem = tk.Menu(mb, tearoff=0)
-        filem.add_command(label="Exit", command=self.quit)
+        filem.add_command(label="Exit", command=self._on_close)
         mb.add_cascade(label="File", menu=filem)
         # Models
         modelm = tk.Menu(mb, tearoff=0)
         modelm.add_command(label="Load Selected Model", command=self.load_selected_model)
         modelm.add_command(label="Load All Models (may be large)", command=self.load_all_models)
+        modelm.add_command(label="Unload Selected Model", command=self.unload_selected_model)
         mb.add_cascade(label="Models", menu=modelm)
         # Help
         helpm = tk.Menu(mb, tearoff=0)
@@ -79,13 +167,13 @@ class AIGUI(BaseGUI, OOPConcepts):
         top_frame.pack(fill="x", padx=8, pady=6)
 
         ttk.Label(top_frame, text="Model Selection:").pack(side="left", padx=(4,8))
-        model_menu = ttk.OptionMenu(top_frame, self.model_var, self.model_var.get(), *self._models.keys())
+        model_menu = ttk.OptionMenu(top_frame, self.model_var, self.model_var.get(), *self._model_factories.keys())
         model_menu.pack(side="left")
 
         load_btn = ttk.Button(top_frame, text="Load Model", command=self.load_selected_model)
         load_btn.pack(side="left", padx=8)
 
-        self.load_status = ttk.Label(top_frame, text=f"Device: {self._device}")
+        self.load_status = ttk.Label(top_frame, text="Device: pending")
         self.load_status.pack(side="right", padx=8)
 
     # -------------------------
@@ -94,10 +182,14 @@ class AIGUI(BaseGUI, OOPConcepts):
     def _build_center(self):
         center = ttk.Frame(self)
         center.pack(expand=True, fill="both", padx=8, pady=4)
+        # two equal-weight columns laid out with grid (single geometry pass on resize)
+        center.columnconfigure(0, weight=1)
+        center.columnconfigure(1, weight=1)
+        center.rowconfigure(0, weight=1)
 
         # Left = User Input Section
         left = ttk.LabelFrame(center, text="User Input Section", padding=(6,6))
-        left.pack(side="left", fill="both", expand=True, padx=4, pady=4)
+        left.grid(row=0, column=0, sticky="nsew", padx=4, pady=4)
 
         # radio buttons: text, image
         self.input_mode = tk.StringVar(value="Text")
@@ -111,6 +203,7 @@ class AIGUI(BaseGUI, OOPConcepts):
         # text input area
         self.input_text = ScrolledText(left, height=7)
         self.input_text.pack(fill="both", expand=False, pady=(6,0))
+        self.input_text.bind("<<Modified>>", self._mark_input_dirty)
 
         # image thumbnail preview under input text
         self.thumbnail_label = ttk.Label(left, text="")
@@ -131,7 +224,7 @@ class AIGUI(BaseGUI, OOPConcepts):
 
         # Right = Model Output Section
         right = ttk.LabelFrame(center, text="Model Output Section", padding=(6,6))
-        right.pack(side="right", fill="both", expand=True, padx=4, pady=4)
+        right.grid(row=0, column=1, sticky="nsew", padx=4, pady=4)
 
         ttk.Label(right, text="Output Display:").pack(anchor="nw")
         # area that can display text and images: we'll use a ScrolledText for textual output,
@@ -151,15 +244,18 @@ class AIGUI(BaseGUI, OOPConcepts):
 
         info_frame = ttk.LabelFrame(bottom, text="Model Information & Explanation", padding=(6,6))
         info_frame.pack(fill="both", expand=True)
+        info_frame.columnconfigure(0, weight=1)
+        info_frame.columnconfigure(1, weight=1)
+        info_frame.rowconfigure(0, weight=1)
 
         left_info = ttk.Frame(info_frame)
-        left_info.pack(side="left", fill="both", expand=True, padx=6, pady=6)
+        left_info.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
         ttk.Label(left_info, text="Selected Model Info:").pack(anchor="nw")
         self.model_info_text = tk.Text(left_info, height=8, width=40, wrap="word")
         self.model_info_text.pack(fill="both", expand=True)
 
         right_info = ttk.Frame(info_frame)
-        right_info.pack(side="right", fill="both", expand=True, padx=6, pady=6)
+        right_info.grid(row=0, column=1, sticky="nsew", padx=6, pady=6)
         ttk.Label(right_info, text="OOP Concepts Explanation:").pack(anchor="nw")
         self.oop_explanation_text = tk.Text(right_info, height=8, width=40, wrap="word")
         self.oop_explanation_text.pack(fill="both", expand=True)
@@ -174,6 +270,15 @@ class AIGUI(BaseGUI, OOPConcepts):
     # -------------------------
     # UI helpers
     # -------------------------
+    def _on_close(self):
+        """Cancel queued loads/runs, then close the window.
+        A load or run already in progress can't be interrupted; main.py exits without it."""
+        self._infer_pool.shutdown(wait=False, cancel_futures=True)
+        self._load_pool.shutdown(wait=False, cancel_futures=True)
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.destroy()
+
     def _show_about(self):
         messagebox.showinfo("About", "Tkinter AI GUI\nDemonstration of OOP concepts + Hugging Face models.")
 
@@ -190,68 +295,171 @@ class AIGUI(BaseGUI, OOPConcepts):
             # optional: let user choose a .txt file to load into text area
             path = filedialog.askopenfilename(title="Open text file", filetypes=[("Text files","*.txt"),("All files","*.*")])
             if path:
-                with open(path, "r", encoding="utf-8") as f:
-                    txt = f.read()
+                if os.path.getsize(path) > MAX_TEXT_INPUT:
+                    messagebox.showwarning("File too large", f"Only the first {MAX_TEXT_INPUT // (1024 * 1024)} MB of the file will be loaded.")
                 self.input_text.delete("1.0", tk.END)
-                self.input_text.insert("1.0", txt)
+                self._io_pool.submit(self._read_text_thread, path)
         else:
             path = filedialog.askopenfilename(title="Open image", filetypes=[("Image files","*.png;*.jpg;*.jpeg;*.bmp;*.gif"),("All files","*.*")])
             if path:
                 # show thumbnail
                 try:
-                    img = Image.open(path)
-                    thumb = make_thumbnail(img)
-                    photo = ImageTk.PhotoImage(thumb)
-                    self._last_photoimage = photo
+                    photo = self._get_thumb(path, (320, 240))
+                    self._input_photoimage = photo
                     self.thumbnail_label.config(image=photo, text="")
                     # store selected path in an attribute
                     self._selected_input_path = path
                 except Exception as e:
                     messagebox.showerror("Error", f"Could not open image: {e}")
 
+    # worker: read a text file in chunks, the drain handler inserts each one
+    def _read_text_thread(self, path):
+        try:
+            # read bytes so the cap matches the file size check; decode incrementally
+            # (a multi-byte character split across chunks is held back until complete)
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            remaining = MAX_TEXT_INPUT
+            with open(path, "rb") as f:
+                while remaining > 0:
+                    data = f.read(min(TEXT_CHUNK_SIZE, remaining))
+                    remaining -= len(data)
+                    # at EOF flush the decoder; at the cap drop a trailing partial character
+                    text = decoder.decode(data, final=not data)
+                    if text:
+                        self._post_result(("text_chunk", text))
+                    if not data:
+                        break
+        except Exception as e:
+            self._post_result(("error", f"Could not read text file: {e}"))
+
     def _clear_input(self):
         self.input_text.delete("1.0", tk.END)
         self.thumbnail_label.config(image="", text="")
         self.output_text.delete("1.0", tk.END)
         self.output_image_label.config(image="", text="")
         self._last_photoimage = None
+        self._input_photoimage = None
 
     # -------------------------
     # Model load/run actions
     # -------------------------
     def load_selected_model(self):
         name = self.model_var.get()
-        self._append_output(f"Loading {name} on device {self._device} ...")
+        self._append_output(f"Loading {name} ...")
         # load in background
-        t = threading.Thread(target=self._load_model_thread, args=(name,), daemon=True)
-        t.start()
+        self._load_pool.submit(self._load_model_thread, name)
 
     def load_all_models(self):
         # load both in a thread
         self._append_output("Loading all models (this may take a while)...")
-        t = threading.Thread(target=self._load_all_thread, daemon=True)
-        t.start()
+        self._load_pool.submit(self._load_all_thread)
+
+    def unload_selected_model(self):
+        name = self.model_var.get()
+        if name not in self._loaded:
+            self._append_output(f"{name} is not loaded.")
+            return
+        self._append_output(f"Unloading {name} ...")
+        # waits on the model's busy lock, so a running pipeline isn't pulled away
+        self._load_pool.submit(self._unload_model_thread, name)
+
+    def _get_model(self, name):
+        """Return the model wrapper for name, creating it on first access."""
+        with self._models_lock:
+            model = self._models.get(name)
+            if model is None:
+                import models  # deferred heavy import
+                model = getattr(models, self._model_factories[name])()
+                self._models[name] = model
+            self._model_lru[name] = None
+            self._model_lru.move_to_end(name)
+            return model
+
+    def _evict_if_needed(self, name):
+        """Unload least-recently-used models until the GPU has room for name.
+        Models with a run in flight (busy lock taken) are skipped, never waited for."""
+        import torch
+        needed = MODEL_VRAM_ESTIMATES.get(name, 0)
+        with self._models_lock:
+            candidates = [n for n in self._model_lru if n != name and n in self._loaded]
+        for other in candidates:
+            free, _total = torch.cuda.mem_get_info()
+            if free >= needed:
+                break
+            busy = self._busy_locks[other]
+            if not busy.acquire(blocking=False):
+                continue
+            try:
+                with self._load_locks[other]:
+                    if other not in self._loaded:
+                        continue
+                    self._loaded.discard(other)
+                    self._models[other].unload()
+            finally:
+                busy.release()
+            self._post_result(("load_ok", f"{other} unloaded to free GPU memory."))
+
+    def _ensure_device(self):
+        """Detect the torch device on first use (imports torch lazily)."""
+        if self._device is None:
+            import torch
+            self._device = detect_device(torch)
+            self._post_result(("device", self._device))
+        return self._device
+
+    def _ensure_loaded(self, name, device=None, warmup=False):
+        """Return the model for name, loading it first if needed
+        (and optionally warming it up right after a fresh load)."""
+        model = self._get_model(name)
+        if name in self._loaded:
+            return model
+        device = device or self._ensure_device()
+        if device == "cuda":
+            self._evict_if_needed(name)
+        with self._load_locks[name]:
+            if name not in self._loaded:  # another thread may have loaded it meanwhile
+                model.load(device=device)
+                if warmup:
+                    model.warmup()
+                self._loaded.add(name)
+        return model
+
+    def _run_loaded(self, name, input_data, device=None):
+        """Run model name on input_data (loading it if needed) with its busy lock held."""
+        with self._busy_locks[name]:
+            return self._ensure_loaded(name, device).run(input_data)
 
     def _load_model_thread(self, name):
         try:
-            model = self._models[name]
-            model.load(device=self._device)
-            self._result_queue.put(("load_ok", f"{name} loaded."))
+            self._ensure_loaded(name, warmup=True)
+            self._post_result(("load_ok", f"{name} loaded."))
         except Exception as e:
-            self._result_queue.put(("error", f"Error loading {name}: {e}"))
+            self._post_result(("error", f"Error loading {name}: {e}"))
 
     def _load_all_thread(self):
         errors = []
-        for name, model in self._models.items():
+        loaded = []
+        for name in self._model_factories:
             try:
-                model.load(device=self._device)
-                self._result_queue.put(("load_ok", f"{name} loaded."))
+                self._ensure_loaded(name, warmup=True)
+                loaded.append(f"{name} loaded.")
             except Exception as e:
                 errors.append((name, str(e)))
+        if loaded:
+            self._post_result(("load_ok_batch", loaded))
         if errors:
-            self._result_queue.put(("error", f"Errors while loading: {errors}"))
+            self._post_result(("error", f"Errors while loading: {errors}"))
 
-    @log_decorator
+    def _unload_model_thread(self, name):
+        try:
+            with self._busy_locks[name], self._load_locks[name]:
+                self._loaded.discard(name)
+                self._get_model(name).unload()
+            self._post_result(("load_ok", f"{name} unloaded."))
+        except Exception as e:
+            self._post_result(("error", f"Error unloading {name}: {e}"))
+
+    @instrument
     def run_selected_model(self):
         """Run the model that is currently selected in the dropdown."""
         name = self.model_var.get()
@@ -259,165 +467,299 @@ class AIGUI(BaseGUI, OOPConcepts):
         if input_payload is None:
             return
         self._append_output(f"Running {name} ...")
-        t = threading.Thread(target=self._run_model_thread, args=(name, input_payload), daemon=True)
-        t.start()
+        self._submit_inference(self._run_model_thread, name, input_payload)
 
-    @log_decorator
+    @instrument
     def run_alternate_model(self):
         """Run the other model (demonstrates chaining / polymorphism).
         If Text->Image is selected, alt runs ImageClass on generated image, etc.
         """
         selected = self.model_var.get()
-        alt_name = [n for n in self._models.keys() if n != selected][0]
+        alt_name = [n for n in self._model_factories if n != selected][0]
         # if we have an on-disk generated image, try classify it
         if selected == "Text-to-Image":
             # run text->image first, then classify
-            prompt = self.input_text.get("1.0", tk.END).strip()
+            prompt = self._get_input_text()
             if not prompt:
                 messagebox.showwarning("Input required", "Enter a prompt to generate an image for chaining.")
                 return
             self._append_output("Running Text->Image and then Image Classification on the generated image ...")
-            t = threading.Thread(target=self._chain_text_to_image_then_classify, args=(prompt,), daemon=True)
-            t.start()
+            self._submit_inference(self._chain_text_to_image_then_classify, prompt)
         else:
             # run the alternate directly on selected input
             input_payload = self._gather_input_for_model(alt_name)
             if input_payload is None:
                 return
             self._append_output(f"Running alternate model: {alt_name} ...")
-            t = threading.Thread(target=self._run_model_thread, args=(alt_name, input_payload), daemon=True)
-            t.start()
+            self._submit_inference(self._run_model_thread, alt_name, input_payload)
+
+    def _submit_inference(self, fn, *args):
+        """Queue fn (a function or coroutine function); Run stays disabled until it finishes."""
+        self._pending_runs += 1
+        self.run1_btn.config(state="disabled")
+        if inspect.iscoroutinefunction(fn):
+            future = asyncio.run_coroutine_threadsafe(fn(*args), self._loop)
+        else:
+            future = self._infer_pool.submit(fn, *args)
+        # done callbacks run on the worker thread, so hand back to Tk via the queue
+        future.add_done_callback(lambda f: self._post_result(("run_done", None)))
+        return future
 
-    def _chain_text_to_image_then_classify(self, prompt):
+    def _enable_run_buttons(self):
+        self.run1_btn.config(state="normal")
+
+    async def _chain_text_to_image_then_classify(self, prompt):
+        loop = asyncio.get_running_loop()
         try:
-            # ensure both models loaded
-            t2i = self._models["Text-to-Image"]
-            cls = self._models["Image Classification"]
-            if not t2i._is_loaded:
-                t2i.load(device=self._device)
-            res = t2i.run(prompt)
-            # res contains path and pil_image
-            img_path = res.get("path")
-            # load classification model
-            if not cls._is_loaded:
-                cls.load()
-            cls_res = cls.run(img_path)
-            self._result_queue.put(("chain", {"image_path": img_path, "classifications": cls_res}))
+            device = await loop.run_in_executor(self._load_pool, self._ensure_device)
+
+            # the classifier loads on the load pool while the image is generated
+            res, _cls = await asyncio.gather(
+                loop.run_in_executor(self._infer_pool, self._run_loaded, "Text-to-Image", prompt, device),
+                loop.run_in_executor(self._load_pool, self._ensure_loaded, "Image Classification", device),
+            )
+            # classify the in-memory image while it is still being saved to disk
+            cls_res, img_path = await asyncio.gather(
+                loop.run_in_executor(self._infer_pool, self._run_loaded,
+                                     "Image Classification", res["pil_image"], device),
+                asyncio.wrap_future(res["path_future"]),
+            )
+            self._post_result(("chain", {"image_path": img_path, "classifications": cls_res}))
         except Exception as e:
-            self._result_queue.put(("error", f"Chain error: {e}"))
+            self._post_result(("error", f"Chain error: {e}"))
+
+    def _mark_input_dirty(self, event=None):
+        self._input_dirty = True
+        self.input_text.edit_modified(False)  # re-arm <<Modified>>
+
+    def _get_input_text(self):
+        """Stripped contents of the input box, cached until the text changes."""
+        if self._input_dirty or self._cached_prompt is None:
+            self._cached_prompt = self.input_text.get("1.0", tk.END).strip()
+            self._input_dirty = False
+        return self._cached_prompt
 
     def _gather_input_for_model(self, model_name):
-        mode = self.input_mode.get()
-        if model_name == "Text-to-Image":
-            if mode != "Text":
-                # if image mode, try to get text from text box anyway
-                self._append_output("Text-to-Image expects a text prompt. Using text input box.")
-            prompt = self.input_text.get("1.0", tk.END).strip()
-            if not prompt:
-                messagebox.showwarning("No prompt", "Please enter a text prompt for Text-to-Image.")
-                return None
-            return prompt
-        elif model_name == "Image Classification":
-            # prefer a selected image path, else check if user pasted a path in input text
-            img_path = getattr(self, "_selected_input_path", None)
-            if not img_path:
-                text_val = self.input_text.get("1.0", tk.END).strip()
-                if os.path.exists(text_val):
-                    img_path = text_val
-            if not img_path:
-                messagebox.showwarning("No image", "Please select an image for classification (Browse -> Image).")
-                return None
-            return img_path
-        else:
+        gatherer = self._gatherers.get(model_name)
+        if gatherer is None:
             messagebox.showerror("Unsupported", f"Unsupported model: {model_name}")
             return None
+        return gatherer()
+
+    def _gather_text_prompt(self):
+        if self.input_mode.get() != "Text":
+            # if image mode, try to get text from text box anyway
+            self._append_output("Text-to-Image expects a text prompt. Using text input box.")
+        prompt = self._get_input_text()
+        if not prompt:
+            messagebox.showwarning("No prompt", "Please enter a text prompt for Text-to-Image.")
+            return None
+        return prompt
+
+    def _gather_image_path(self):
+        # prefer a selected image path, else check if user pasted a path in input text
+        img_path = getattr(self, "_selected_input_path", None)
+        if not img_path:
+            text_val = self._get_input_text()
+            # only stat text that could plausibly be a path (not a long prompt)
+            if (0 < len(text_val) < MAX_PATH_LEN and "\n" not in text_val
+                    and os.path.isfile(text_val)):
+                img_path = text_val
+        if not img_path:
+            messagebox.showwarning("No image", "Please select an image for classification (Browse -> Image).")
+            return None
+        return img_path
+
+    # -------------------------
+    # Inference cache
+    # -------------------------
+    def _cache_key(self, model_name, input_payload):
+        """Hash (model_name, input). Image paths are hashed by file content."""
+        h = hashlib.sha1(model_name.encode("utf-8"))
+        if model_name == "Image Classification" and os.path.isfile(input_payload):
+            with open(input_payload, "rb") as f:
+                h.update(f.read())
+        else:
+            h.update(repr(input_payload).encode("utf-8"))
+        return h.hexdigest()
+
+    def _cache_get(self, key):
+        with self._infer_cache_lock:
+            res = self._infer_cache.get(key)
+            if res is not None:
+                self._infer_cache.move_to_end(key)
+            return res
+
+    def _cache_put(self, key, res):
+        with self._infer_cache_lock:
+            self._infer_cache[key] = res
+            self._infer_cache.move_to_end(key)
+            while len(self._infer_cache) > self._infer_cache_size:
+                self._infer_cache.popitem(last=False)
 
     # worker thread executes model.run and posts results to the queue
     def _run_model_thread(self, model_name, input_payload):
         try:
-            model = self._models[model_name]
-            if not model._is_loaded:
-                model.load(device=self._device)
-            res = model.run(input_payload)
-            self._result_queue.put(("run_result", {"model": model_name, "result": res}))
+            key = self._cache_key(model_name, input_payload)
+            res = self._cache_get(key)
+            if res is not None:
+                if res["type"] == "image":
+                    # output file may have been overwritten by a later run: re-save through
+                    # the (single-worker) background save pool so saves never interleave
+                    _path, path_future = save_pil_image(
+                        res["pil_image"], res["path_future"].result(), async_save=True)
+                    res = dict(res, path_future=path_future)
+                self._post_result(("run_result", {"model": model_name, "result": res}))
+                return
+            res = self._run_loaded(model_name, input_payload)
+            self._cache_put(key, res)
+            self._post_result(("run_result", {"model": model_name, "result": res}))
         except Exception as e:
-            self._result_queue.put(("error", f"Error running {model_name}: {e}"))
+            self._post_result(("error", f"Error running {model_name}: {e}"))
 
-    # poll queue frequently to update UI from main thread
-    def _poll_results(self):
+    # called from worker threads: queue the result and wake the Tk main loop
+    def _post_result(self, item):
+        self._result_queue.put(item)
+        try:
+            self.event_generate("<<ModelResult>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # Tk is shutting down; the safety-net poll picks up anything left
+            pass
+
+    # drain queued results on the main thread
+    def _drain_queue(self, event=None):
         try:
             while True:
                 kind, payload = self._result_queue.get_nowait()
                 if kind == "load_ok":
                     self._append_output(payload)
                     self._refresh_model_info()
+                elif kind == "load_ok_batch":
+                    self._append_output_lines(payload)
+                    self._refresh_model_info()
                 elif kind == "run_result":
                     self._handle_model_result(payload)
                 elif kind == "chain":
                     self._handle_chain_result(payload)
+                elif kind == "image_saved":
+                    self._append_output(payload)
+                elif kind == "device":
+                    self.load_status.config(text=f"Device: {payload}")
+                elif kind == "text_chunk":
+                    self.input_text.insert(tk.END, payload)
+                elif kind == "run_done":
+                    self._pending_runs -= 1
+                    if self._pending_runs == 0:
+                        self._enable_run_buttons()
                 elif kind == "error":
                     self._append_output(f"[ERROR] {payload}")
                     messagebox.showerror("Error", str(payload))
         except queue.Empty:
             pass
-        # schedule next poll
-        self.after(200, self._poll_results)
+
+    def _poll_results(self):
+        self._drain_queue()
+        self.after(1000, self._poll_results)
 
     # result handlers
     def _handle_model_result(self, payload):
         model_name = payload.get("model")
         res = payload.get("result")
-        if res["type"] == "image":
-            path = res["path"]
-            self._append_output(f"{model_name} generated image: {path}")
-            self._display_image(path)
-        elif res["type"] == "classifications":
-            lines = [f"{model_name} results:"]
-            for r in res["results"]:
-                lines.append(f"- {r.get('label')}: {r.get('score'):.3f}")
-            self._append_output("\n".join(lines))
-        else:
-            self._append_output(f"{model_name} returned: {res}")
+        self._result_handlers.get(res["type"], self._handle_unknown_result)(model_name, res)
+
+    def _handle_image_result(self, model_name, res):
+        # show the image right away; report the path once the background save finishes
+        self._display_pil_image(res["pil_image"])
+        res["path_future"].add_done_callback(
+            lambda f: self._on_image_saved(model_name, f))
+
+    # runs on the saving thread
+    def _on_image_saved(self, model_name, future):
+        try:
+            self._post_result(("image_saved", f"{model_name} generated image: {future.result()}"))
+        except Exception as e:
+            self._post_result(("error", f"Could not save image: {e}"))
+
+    def _handle_classification_result(self, model_name, res):
+        lines = [f"{model_name} results:"]
+        for r in res["results"]:
+            lines.append(f"- {r.get('label')}: {r.get('score'):.3f}")
+        self._append_output_lines(lines)
+
+    def _handle_unknown_result(self, model_name, res):
+        self._append_output(f"{model_name} returned: {res}")
 
     def _handle_chain_result(self, payload):
         img_path = payload["image_path"]
         cls_res = payload["classifications"]
-        self._append_output(f"Generated image saved at: {img_path}")
         self._display_image(img_path)
-        # show classification results
-        lines = ["Chain classification results:"]
-        for r in cls_res:
+        # show save location and classification results in one write
+        lines = [f"Generated image saved at: {img_path}", "", "Chain classification results:"]
+        for r in cls_res["results"]:
             lines.append(f"- {r.get('label')}: {r.get('score'):.3f}")
-        self._append_output("\n".join(lines))
+        self._append_output_lines(lines)
 
     # -------------------------
     # UI update helpers
     # -------------------------
     def _append_output(self, text):
-        self.output_text.insert(tk.END, text + "\n\n")
+        self._append_output_lines([text])
+
+    def _append_output_lines(self, lines):
+        # single insert + scroll, however many lines
+        self.output_text.insert(tk.END, "\n".join(lines) + "\n\n")
+        line_count = int(self.output_text.index("end-1c").split(".")[0])
+        if line_count > MAX_OUTPUT_LINES:
+            self.output_text.delete("1.0", f"{line_count - MAX_OUTPUT_LINES}.0")
         self.output_text.see(tk.END)
 
     def _display_image(self, path):
         try:
-            img = Image.open(path)
+            photo = self._get_thumb(path, (420, 320))
+            self._last_photoimage = photo  # keep reference
+            self.output_image_label.config(image=photo, text="")
+        except Exception as e:
+            self._append_output(f"Could not display image: {e}")
+
+    def _display_pil_image(self, img):
+        try:
             thumb = make_thumbnail(img, size=(420, 320))
-            photo = ImageTk.PhotoImage(thumb)
+            photo = self._output_photoimage
+            if photo is not None and (photo.width(), photo.height()) == thumb.size:
+                photo.paste(thumb)  # reuse the Tk image buffer
+            else:
+                photo = ImageTk.PhotoImage(thumb)
+                self._output_photoimage = photo
             self._last_photoimage = photo  # keep reference
             self.output_image_label.config(image=photo, text="")
         except Exception as e:
             self._append_output(f"Could not display image: {e}")
 
+    def _get_thumb(self, path, size):
+        """Return a PhotoImage thumbnail of path, decoding only on a cache miss."""
+        st = os.stat(path)
+        key = (os.path.realpath(path), st.st_mtime_ns, st.st_size, size)
+        photo = self._thumb_cache.get(key)
+        if photo is not None:
+            self._thumb_cache.move_to_end(key)
+            return photo
+        img = Image.open(path)
+        img.draft("RGB", size)  # let JPEGs decode at reduced scale
+        photo = ImageTk.PhotoImage(make_thumbnail(img, size=size))
+        self._thumb_cache[key] = photo
+        if len(self._thumb_cache) > THUMB_CACHE_SIZE:
+            self._thumb_cache.popitem(last=False)
+        return photo
+
     # refresh bottom-left model info text
     def _refresh_model_info(self):
         name = self.model_var.get()
-        model = self._models[name]
+        model = self._get_model(name)
         info = model.get_info()
-        text = (
-            f"Model Name: {info['name']}\n"
-            f"Category: {info['category']}\n"
-            f"Description: {info['description']}\n"
-            f"Loaded: {info['loaded']}\n"
-        )
+        text = _format_info(info["name"], info["category"], info["description"], info["loaded"])
+        if text == self._info_cache:
+            return
+        self._info_cache = text
         self.model_info_text.config(state="normal")
         self.model_info_text.delete("1.0", tk.END)
         self.model_info_text.insert("1.0", text)
@@ -425,7 +767,10 @@ class AIGUI(BaseGUI, OOPConcepts):
 
     # refresh bottom-right OOP explanation text (calls overridden method)
     def _refresh_oop_explanation(self):
+        if self._oop_text is not None:
+            return  # already rendered; the explanation never changes
         explanation = self.explanation()  # overridden method from OOPConcepts
+        self._oop_text = explanation
         self.oop_explanation_text.config(state="normal")
         self.oop_explanation_text.delete("1.0", tk.END)
         self.oop_explanation_text.insert("1.0", explanation)
@@ -1,5 +1,17 @@
+import logging
+import os
+
 from gui import AIGUI
+from utils import shutdown_saves
 
 if __name__ == "__main__":
+    # DEBUG_TIMING=1 shows the decorator log/timing output
+    logging.basicConfig(level=logging.WARNING)
+    if os.environ.get("DEBUG_TIMING"):
+        logging.getLogger("oop_concepts").setLevel(logging.DEBUG)
     app = AIGUI()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    # finish writing generated images, but don't wait for a download/load/generation
+    # still running on the (non-daemon) pool workers
+    shutdown_saves()
+    os._exit(0)
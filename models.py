@@ -3,21 +3,83 @@ Model wrappers demonstrating:
 - Encapsulation (protected attributes like _name, _pipeline)
 - Polymorphism (BaseModel.run is overridden)
 - Lazy loading: heavy HF models are loaded only when load() is called
+  (torch, transformers and diffusers themselves are imported then too, so importing
+  this module is cheap)
 """
 
-from abc import ABC, abstractmethod
-from transformers import pipeline as hf_pipeline
-try:
-    from diffusers import StableDiffusionPipeline
-except Exception:
-    StableDiffusionPipeline = None
+import logging
+import weakref
+from PIL import Image
+from utils import save_pil_image, detect_device
 
-import torch
-from utils import save_pil_image
+# heavy dependencies, filled in on first use by the _import_* helpers below
+torch = None
+hf_pipeline = None
+StableDiffusionPipeline = None
+AttnProcessor2_0 = None
+
+log = logging.getLogger(__name__)
+
+def _import_torch():
+    global torch
+    if torch is None:
+        import torch as torch_
+        # let cuDNN pick the fastest conv algorithms (input shapes are fixed per model)
+        # and allow fused (Flash / memory-efficient) scaled-dot-product attention kernels
+        if torch_.cuda.is_available():
+            torch_.backends.cudnn.benchmark = True
+            torch_.backends.cuda.enable_flash_sdp(True)
+            torch_.backends.cuda.enable_mem_efficient_sdp(True)
+        torch = torch_
+    return torch
+
+def _import_transformers():
+    global hf_pipeline
+    _import_torch()
+    if hf_pipeline is None:
+        from transformers import pipeline as hf_pipeline_
+        hf_pipeline = hf_pipeline_
+
+def _import_diffusers():
+    global StableDiffusionPipeline, AttnProcessor2_0
+    _import_torch()
+    if StableDiffusionPipeline is None:
+        try:
+            from diffusers import StableDiffusionPipeline as pipeline_cls
+        except Exception:
+            return  # load() reports the missing dependency
+        try:
+            from diffusers.models.attention_processor import AttnProcessor2_0 as attn_cls
+        except Exception:
+            attn_cls = None
+        AttnProcessor2_0 = attn_cls
+        StableDiffusionPipeline = pipeline_cls
+
+def _default_device():
+    """Best device string for this machine (imports torch on first call)."""
+    return detect_device(_import_torch())
+
+def _pin_and_move(module, device):
+    """Pin a CPU-loaded module's weights, then copy them to the GPU asynchronously.
+    Pinned (page-locked) host memory lets the copies run as fast DMA transfers."""
+    for p in module.parameters():
+        p.data = p.data.pin_memory()
+    for b in module.buffers():
+        b.data = b.data.pin_memory()
+    module.to(device, non_blocking=True)
+
+def _release_pinned():
+    """Wait for the copies started by _pin_and_move, then return the staging memory.
+    The caching host allocator keeps freed pinned blocks (rounded up to powers of two),
+    which would otherwise stay page-locked for the life of the process."""
+    torch.cuda.synchronize()
+    empty_host_cache = getattr(torch._C, "_host_emptyCache", None)
+    if empty_host_cache is not None:
+        empty_host_cache()
 
 # Abstract Base Model Class
 
-class BaseModel(ABC):
+class BaseModel:
     
     """
     Abstract base class for model wrappers.
@@ -26,7 +88,17 @@ class BaseModel(ABC):
     - Encapsulation: protected attributes (_name, _pipeline, etc.)
     - Lazy loading: models are not loaded until `load()` is called
     - Polymorphism: subclasses must implement `load` and `run`
+      (checked once when the subclass is defined, so instantiation skips ABCMeta)
+    - __slots__: no per-instance __dict__
     """
+
+    __slots__ = ("_name", "_category", "_description", "_pipeline", "_is_loaded")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method in ("load", "run"):
+            if getattr(cls, method) is getattr(BaseModel, method):
+                raise TypeError(f"{cls.__name__} must implement {method}()")
     
     def __init__(self, name: str, category: str, description: str):
         self._name = name                 # protected attribute (encapsulation)
@@ -44,7 +116,6 @@ class BaseModel(ABC):
             "loaded": self._is_loaded
         }
 
-    @abstractmethod
     def load(self, device="cpu"):
         """
         Abstract method: must be implemented by subclasses.
@@ -52,7 +123,21 @@ class BaseModel(ABC):
         """
         raise NotImplementedError
 
-    @abstractmethod
+    def warmup(self):
+        """
+        Run a tiny dummy inference so first-call overhead (lazy init, kernel
+        selection, JIT) is paid at load time instead of on the user's first run.
+        Default: nothing to warm up.
+        """
+        pass
+
+    def unload(self):
+        """Drop the pipeline so its (GPU) memory can be reclaimed; load() works again afterwards."""
+        self._pipeline = None
+        self._is_loaded = False
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
     def run(self, input_data):
         """Run the model on input_data. Must be overridden.
             Defines how the model processes `input_data`.
@@ -63,35 +148,201 @@ class BaseModel(ABC):
 # Text-to-Image Model
 class TextToImageModel(BaseModel):
     """Uses diffusers StableDiffusionPipeline. Lazy-loads on demand."""
+
+    __slots__ = (
+        "_lcm",        # True when loaded with the LCM-LoRA few-step sampler
+        "_warmed_up",  # warmup() already ran since the last load (e.g. inside load())
+    )
+
+    # sampling defaults: DPM-Solver++ needs ~20 steps for the quality of ~50 default (PNDM) steps;
+    # the LCM-LoRA adapter gets there in 4 steps without classifier-free guidance
+    DEFAULT_STEPS, DEFAULT_GUIDANCE = 20, 7.0
+    LCM_STEPS, LCM_GUIDANCE = 4, 1.0
+    LCM_LORA = "latent-consistency/lcm-lora-sdv1-5"
+
+    # loaded pipelines shared between instances: (name, device, dtype, load options) -> pipeline.
+    # Weak values, so a pipeline is freed once no instance uses it (e.g. after unload()).
+    _PIPELINE_CACHE = weakref.WeakValueDictionary()
+
     def __init__(self, model_name="runwayml/stable-diffusion-v1-5"):
         super().__init__(model_name, "Text-to-Image", "Stable Diffusion text->image generator.")
+        self._lcm = False
+        self._warmed_up = False
 
-    def load(self, device="cpu"):
-        """Load the Stable Diffusion pipeline onto the given device."""
+    def load(self, device="cpu", compile_model=True, quantize="none", low_memory=True, warmup=True,
+             lcm=False):
+        """
+        Load the Stable Diffusion pipeline onto the given device.
+        On CUDA the UNet is compiled with torch.compile (disable with compile_model=False);
+        with warmup=True a one-step generation then pays the compilation cost here instead
+        of on the first run(). If compilation fails the UNet falls back to eager mode.
+        quantize: "none", "int8" (bitsandbytes) or "fp8" (torchao) weights for the UNet only,
+        text encoder and VAE stay in fp16. Quantization requires CUDA (fp8: compute capability 8.9+).
+        low_memory: decode the VAE in slices/tiles to lower peak memory.
+        lcm: fuse the LCM-LoRA adapter and use the LCM scheduler (4-step generation);
+        otherwise the DPM-Solver++ multistep scheduler is used.
+        """
         if self._is_loaded:
             return
+        _import_diffusers()
         if StableDiffusionPipeline is None:
             raise RuntimeError("diffusers not installed or unavailable. Run: pip install diffusers accelerate safetensors")
+        if quantize not in ("none", "int8", "fp8"):
+            raise ValueError(f"Unknown quantize option: {quantize!r} (expected 'none', 'int8' or 'fp8')")
+        if quantize != "none" and device != "cuda":
+            raise RuntimeError(f"{quantize} quantization requires a CUDA device")
+        if quantize == "fp8" and torch.cuda.get_device_capability() < (8, 9):
+            # torchao float8 matmuls need Ada/Hopper tensor cores
+            raise RuntimeError("fp8 quantization requires a GPU with compute capability 8.9 or newer")
         dtype = torch.float16 if device in ("cuda", "mps") else torch.float32
+        compiled = compile_model and device == "cuda"
+        key = (self._name, device, str(dtype), compiled, quantize, low_memory, lcm)
+        self._lcm = lcm
+        self._warmed_up = False
+        cached = self._PIPELINE_CACHE.get(key)
+        if cached is not None:
+            # already built (and compiled/warmed up) by another instance
+            self._pipeline = cached
+            self._is_loaded = True
+            return
         # from_pretrained will download the model the first time
-        self._pipeline = StableDiffusionPipeline.from_pretrained(self._name, torch_dtype=dtype)
-        # move to device
+        # the safety checker is an extra CLIP forward pass per image; skipped for speed
+        # weights are loaded on CPU (never mapped straight to CUDA), see _pin_and_move
+        extra = {}
+        if quantize == "int8":
+            # bitsandbytes places the 8-bit UNet on the GPU itself
+            try:
+                from diffusers import BitsAndBytesConfig, UNet2DConditionModel
+            except Exception:
+                raise RuntimeError("int8 quantization needs a recent diffusers. Run: pip install -U diffusers bitsandbytes")
+            extra["unet"] = UNet2DConditionModel.from_pretrained(
+                self._name, subfolder="unet", torch_dtype=dtype,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True))
+        self._pipeline = StableDiffusionPipeline.from_pretrained(
+            self._name, torch_dtype=dtype, safety_checker=None, requires_safety_checker=False,
+            low_cpu_mem_usage=True, **extra)
+        # faster samplers: fewer UNet passes per image
+        if lcm:
+            try:
+                from diffusers import LCMScheduler
+            except Exception:
+                raise RuntimeError("LCM needs a recent diffusers. Run: pip install -U diffusers peft")
+            self._pipeline.scheduler = LCMScheduler.from_config(self._pipeline.scheduler.config)
+            try:
+                import peft  # noqa: F401  (load_lora_weights needs the PEFT backend)
+            except Exception:
+                raise RuntimeError("LCM-LoRA needs peft. Run: pip install peft")
+            self._pipeline.load_lora_weights(self.LCM_LORA)
+            self._pipeline.fuse_lora()  # bake the adapter into the weights, no per-step LoRA cost
+        else:
+            from diffusers import DPMSolverMultistepScheduler
+            self._pipeline.scheduler = DPMSolverMultistepScheduler.from_config(self._pipeline.scheduler.config)
+        if device == "cuda":
+            # the large components go through pinned memory
+            components = [self._pipeline.vae, self._pipeline.text_encoder]
+            if quantize != "int8":
+                components.append(self._pipeline.unet)
+            for component in components:
+                _pin_and_move(component, device)
+            _release_pinned()
+        # move (remaining components) to device
         self._pipeline = self._pipeline.to(device)
+        if AttnProcessor2_0 is not None:
+            # PyTorch SDPA attention instead of materializing the full attention matrix
+            try:
+                self._pipeline.unet.set_attn_processor(AttnProcessor2_0())
+            except Exception:
+                pass
+        if low_memory:
+            self._pipeline.enable_vae_slicing()
+            self._pipeline.enable_vae_tiling()
+            if AttnProcessor2_0 is None:
+                # sliced attention would replace the (already memory-efficient) SDPA processor
+                self._pipeline.enable_attention_slicing("auto")
+        if device == "cuda":
+            # NHWC layout matches tensor-core conv kernels (no transposes around each conv)
+            if quantize != "int8":
+                self._pipeline.unet.to(memory_format=torch.channels_last)
+            self._pipeline.vae.to(memory_format=torch.channels_last)
+        if quantize == "fp8":
+            try:
+                from torchao.quantization import quantize_, float8_dynamic_activation_float8_weight
+            except Exception:
+                raise RuntimeError("fp8 quantization needs torchao. Run: pip install torchao")
+            quantize_(self._pipeline.unet, float8_dynamic_activation_float8_weight())
+        if compiled:
+            # bitsandbytes layers don't trace as a single graph
+            self._pipeline.unet = torch.compile(self._pipeline.unet, mode="reduce-overhead",
+                                                fullgraph=quantize != "int8")
         self._is_loaded = True
+        if compiled and warmup:
+            from torch._dynamo.exc import TorchDynamoException
+            try:
+                # same resolution/guidance as run(), so the compiled graph is reused
+                self.warmup()
+            except TorchDynamoException:
+                # compilation failed (inductor errors are wrapped too): run the UNet eagerly
+                log.warning("torch.compile failed for %s, falling back to eager mode",
+                            self._name, exc_info=True)
+                self._pipeline.unet = self._pipeline.unet._orig_mod
+                compiled = False
+                key = (self._name, device, str(dtype), compiled, quantize, low_memory, lcm)
+            except Exception:
+                # anything else (e.g. out of memory) is a real load failure
+                self._is_loaded = False
+                self._pipeline = None
+                raise
+        self._PIPELINE_CACHE[key] = self._pipeline
 
-    def run(self, prompt: str):
+    def unload(self):
+        compiled = self._pipeline is not None and hasattr(self._pipeline.unet, "_orig_mod")
+        self._pipeline = None
+        self._warmed_up = False
+        if compiled:
+            # torch.compile's caches and the reduce-overhead CUDA-graph pool still reference
+            # the compiled UNet; reset them so empty_cache() can actually release its VRAM
+            torch._dynamo.reset()
+        super().unload()
+
+    def _sampling_defaults(self):
+        if self._lcm:
+            return self.LCM_STEPS, self.LCM_GUIDANCE
+        return self.DEFAULT_STEPS, self.DEFAULT_GUIDANCE
+
+    def warmup(self):
+        """Single one-step generation on CUDA; the image is discarded.
+        Skipped if load() already warmed up (compiled UNet), and on CPU/MPS where
+        nothing is compiled or autotuned (it would only add seconds to the load)."""
+        if self._is_loaded and not self._warmed_up and self._pipeline.device.type == "cuda":
+            # same guidance as run(): it decides the UNet batch size (compiled graphs are shape-specific)
+            _steps, guidance_scale = self._sampling_defaults()
+            with torch.inference_mode():
+                self._pipeline("a", num_inference_steps=1, guidance_scale=guidance_scale)
+            self._warmed_up = True
+
+    def run(self, prompt: str, num_inference_steps: int = None, guidance_scale: float = None):
         """
         Generate an image from a text prompt.
         Automatically loads the model if not already loaded.
+        Steps/guidance default to 20 / 7.0 (4 / 1.0 when loaded with lcm=True).
+        The image is saved in the background: "path_future" resolves to the saved path.
         """
         if not self._is_loaded:
-            # default to cpu; caller can call load() with preferred device
-            self.load(device="cpu")
+            # default to the best available device; caller can call load() to choose
+            self.load(device=_default_device())
+        default_steps, default_guidance = self._sampling_defaults()
+        if num_inference_steps is None:
+            num_inference_steps = default_steps
+        if guidance_scale is None:
+            guidance_scale = default_guidance
         # pipeline returns a PipelineOutput containing .images
-        output = self._pipeline(prompt)
+        with torch.inference_mode():  # no autograd/version tracking
+            output = self._pipeline(prompt, num_inference_steps=num_inference_steps,
+                                    guidance_scale=guidance_scale)
         image = output.images[0]
-        path = save_pil_image(image, "generated_image.png")
-        return {"type": "image", "path": path, "pil_image": image}
+        # PNG encoding happens off the inference thread
+        _path, path_future = save_pil_image(image, "generated_image.png", async_save=True)
+        return {"type": "image", "path_future": path_future, "pil_image": image}
 
 # Image Classification Model
 class ImageClassificationModel(BaseModel):
@@ -99,23 +350,73 @@ class ImageClassificationModel(BaseModel):
     Image classification using HuggingFace transformers pipeline.
     Uses transformers pipeline for image-classification
     """
+
+    __slots__ = ("_img_buf",)  # pinned host staging buffer for single images on CUDA
+
+    # loaded pipelines shared between instances: (name, device) -> pipeline (weak values)
+    _PIPELINE_CACHE = weakref.WeakValueDictionary()
+
     def __init__(self, model_name="google/vit-base-patch16-224"):
         super().__init__(model_name, "Image Classification", "Classify images using ViT.")
+        self._img_buf = None
 
     def load(self, device="cpu"):
         if self._is_loaded:
             return
-        # transformers pipelines handle device automatically but we keep this simple
-        # device argument: -1 = cpu, 0 = first GPU. We'll set to -1 for safety.
-        self._pipeline = hf_pipeline("image-classification", model=self._name, device=-1)
+        _import_transformers()
+        key = (self._name, device)
+        self._pipeline = self._PIPELINE_CACHE.get(key)
+        if self._pipeline is None:
+            # device argument: -1 = cpu, 0 = first GPU
+            self._pipeline = hf_pipeline("image-classification", model=self._name,
+                                         device=0 if device == "cuda" else -1)
+            self._PIPELINE_CACHE[key] = self._pipeline
         self._is_loaded = True
 
-    def run(self, image):  # expects a PIL image or path
+    def warmup(self):
+        """Classify a blank 224x224 image a couple of times (results discarded),
+        through the same path run() takes for a single image."""
+        if self._is_loaded:
+            blank = Image.new("RGB", (224, 224))
+            classify = self._classify_pinned if self._pipeline.device.type == "cuda" else self._pipeline
+            for _ in range(2):
+                classify(blank)
+
+    def unload(self):
+        self._img_buf = None
+        super().unload()
+
+    def _classify_pinned(self, image, top_k=5):
+        """
+        Single-image CUDA path: preprocess on the CPU into a reused pinned buffer, then
+        copy to the GPU with non_blocking=True (pageable copies are much slower).
+        Pre/postprocessing are the pipeline's own (paths/URLs, softmax vs sigmoid), so this
+        returns the same [{"label", "score"}, ...] list as the pipeline.
+        """
+        pixels = self._pipeline.preprocess(image)["pixel_values"]
+        if self._img_buf is None or self._img_buf.shape != pixels.shape:
+            self._img_buf = torch.empty(pixels.shape, dtype=pixels.dtype, pin_memory=True)
+        self._img_buf.copy_(pixels)
+        model = self._pipeline.model
+        with torch.inference_mode():
+            logits = model(pixel_values=self._img_buf.to(model.device, non_blocking=True)).logits
+        # .cpu() waits for the GPU, so the buffer is free again before the next call
+        return self._pipeline.postprocess({"logits": logits.cpu()},
+                                          top_k=min(top_k, model.config.num_labels))
+
+    def run(self, image, batch_size: int = 8):  # expects a PIL image or path (or a list of them)
         """
         Classify a given image.
-        Accepts a PIL.Image object or a file path.
+        Accepts a PIL.Image object or a file path, or a list/tuple of them;
+        lists are classified in batches of batch_size and give one result list per image.
         """
         if not self._is_loaded:
-            self.load()
-        results = self._pipeline(image)
+            self.load(device=_default_device())
+        if isinstance(image, (list, tuple)):
+            results = self._pipeline(list(image), batch_size=batch_size)
+            return {"type": "batch_classifications", "results": results}
+        if self._pipeline.device.type == "cuda":
+            results = self._classify_pinned(image)
+        else:
+            results = self._pipeline(image)
         return {"type": "classifications", "results": results}
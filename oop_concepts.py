@@ -1,42 +1,65 @@
 """
 OOP concepts helpers:
-- Decorators (log_decorator, time_decorator) -> used by GUI/model methods
+- Decorators (log_decorator, time_decorator, and instrument = both fused) -> used by GUI/model methods
+  Output goes to the "oop_concepts" logger at DEBUG level; nothing is formatted when that is off.
 - OOPExplanation base class + OOPConcepts subclass -> demonstrates method overriding
 - Multiple inheritance will be used by the GUI (AIGUI inherits from BaseGUI and OOPConcepts)
 """
 
+import logging
 import time
 from functools import wraps
 
+log = logging.getLogger(__name__)
+
 def log_decorator(func):
-    """Logs function entry/exit to console (and returns original result)."""
+    """Logs function entry/exit (and returns original result)."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        print(f"[LOG] Entering {func.__name__}")
+        enabled = log.isEnabledFor(logging.DEBUG)
+        if enabled:
+            log.debug("[LOG] Entering %s", func.__name__)
         result = func(*args, **kwargs)
-        print(f"[LOG] Exiting {func.__name__}")
+        if enabled:
+            log.debug("[LOG] Exiting %s", func.__name__)
         return result
     return wrapper
 
 def time_decorator(func):
-    """Measures elapsed time (notifies via print)."""
+    """Measures elapsed time with a high-resolution monotonic clock."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not log.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        t0 = time.perf_counter_ns()
+        res = func(*args, **kwargs)
+        log.debug("[TIME] %s took %.6fs", func.__name__, (time.perf_counter_ns() - t0) / 1e9)
+        return res
+    return wrapper
+
+def instrument(func):
+    """log_decorator + time_decorator fused into a single wrapper frame."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        t0 = time.time()
+        if not log.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        log.debug("[LOG] Entering %s", func.__name__)
+        t0 = time.perf_counter_ns()
         res = func(*args, **kwargs)
-        t1 = time.time()
-        print(f"[TIME] {func.__name__} took {t1-t0:.2f}s")
+        log.debug("[LOG] Exiting %s (took %.6fs)", func.__name__, (time.perf_counter_ns() - t0) / 1e9)
         return res
     return wrapper
 
 class OOPExplanation:
     """Base class whose method will be overridden by a subclass to show
     method overriding in action."""
+    __slots__ = ()  # no per-instance state (also safe to mix into the Tk window)
     def explanation(self):
         return "OOPExplanation: base explanation (should be overridden)."
 
 class OOPConcepts(OOPExplanation):
     """Subclass that overrides explanation() and applies multiple decorators."""
+    __slots__ = ()
     @log_decorator
     @time_decorator
     def explanation(self):
@@ -1,8 +1,19 @@
 import os
-from PIL import ImageOps
+import functools
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# background image encoding; a single worker keeps saves to the same path in order
+_save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
 
 def detect_device(torch):
-    """Return best device string given torch availability."""
+    """Return best device string given torch availability (probed once per process)."""
+    return _detect_device(torch)
+
+@functools.lru_cache(maxsize=1)
+def _detect_device(torch):
     try:
         if torch.cuda.is_available():
             return "cuda"
@@ -13,12 +24,48 @@ def detect_device(torch):
         pass
     return "cpu"
 
-def save_pil_image(image, path="generated_image.png"):
-    #  Save a PIL image to disk.
-    image.save(path)
-    return os.path.abspath(path)
+# re-probe on the next call, e.g. after changing CUDA_VISIBLE_DEVICES
+detect_device.cache_clear = _detect_device.cache_clear
+
+def save_pil_image(image, path="generated_image.png", compress_level=1, async_save=False, format="PNG"):
+    #  Save a PIL image to disk and return its absolute path.
+    #  PNG uses a low zlib level (much faster encode, slightly larger file); format="WEBP" is faster still.
+    #  With async_save=True the encode runs on a worker thread and (path, future) is returned;
+    #  the future resolves to the path once the file is written.
+    abs_path = os.path.abspath(path)
+    if async_save:
+        return abs_path, _save_pool.submit(_encode_image, image, abs_path, compress_level, format)
+    return _encode_image(image, abs_path, compress_level, format)
+
+def shutdown_saves():
+    #  Wait for queued background saves to be written (call before exiting).
+    _save_pool.shutdown(wait=True)
+
+def _encode_image(image, path, compress_level, format):
+    if format.upper() == "WEBP":
+        image.save(path, "WEBP", quality=90, method=0)
+    else:
+        image.save(path, "PNG", compress_level=compress_level, optimize=False)
+    return path
+
+# recent thumbnails: (id(source), size, source.size) -> (weakref to source, thumbnail).
+# PIL images aren't hashable, hence the id; the weakref guards against id reuse and
+# drops the entry once the source image is garbage collected.
+_thumb_cache = OrderedDict()
+_THUMB_CACHE_SIZE = 32
 
 def make_thumbnail(pil_image, size=(320, 240)):
-    # maintain aspect ratio
-    img = ImageOps.contain(pil_image, size)
+    # maintain aspect ratio; the result is cached per source image, so don't modify it in place
+    key = (id(pil_image), tuple(size), pil_image.size)
+    entry = _thumb_cache.get(key)
+    if entry is not None and entry[0]() is pil_image:
+        _thumb_cache.move_to_end(key)
+        return entry[1]
+    # reducing_gap box-filters down first, then LANCZOS for the rest
+    # (thumbnail works in place, so resize a copy and leave the caller's image untouched)
+    img = pil_image.copy()
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    _thumb_cache[key] = (weakref.ref(pil_image, lambda _ref, k=key: _thumb_cache.pop(k, None)), img)
+    if len(_thumb_cache) > _THUMB_CACHE_SIZE:
+        _thumb_cache.popitem(last=False)
     return img